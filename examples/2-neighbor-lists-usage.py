@@ -136,8 +136,8 @@ def distances(
     atom_is = neighbor_indices[:, 0]
     atom_js = neighbor_indices[:, 1]
 
-    pos_is = positions[atom_is]
-    pos_js = positions[atom_js]
+    pos_is = torch.index_select(positions, 0, atom_is)
+    pos_js = torch.index_select(positions, 0, atom_js)
 
     distance_vectors = pos_js - pos_is
 
@@ -149,7 +149,7 @@ def distances(
     elif cell is None and neighbor_shifts is not None:
         raise ValueError("Provided `neighbor_shifts` but no `cell`.")
 
-    return torch.linalg.norm(distance_vectors, dim=1)
+    return torch.sqrt(torch.sum(distance_vectors**2, dim=1))
 
 
 # %%
@@ -1,6 +1,10 @@
 import torch
 
-from ..lib import generate_kvectors_for_ewald
+from ..lib.kvectors import (
+    _generate_kvector_axes,
+    _kvectors_norm_sq,
+    _reciprocal_cell,
+)
 from ..potentials import Potential
 from .calculator import Calculator
 
@@ -53,6 +57,25 @@ class EwaldCalculator(Calculator):
         :obj:`False`, a "half" neighbor list is expected.
     :param prefactor: electrostatics prefactor; see :ref:`prefactors` for details and
         common values.
+    :param kvectors_chunk_size: Number of reciprocal space vectors that are processed
+        at once. The reciprocal space sum is accumulated chunk by chunk, which bounds
+        the size of the intermediate ``(n_kvectors, n_atoms)`` tensors for large
+        systems.
+    :param mixed_precision: If set to :obj:`True`, the phase factors and structure
+        factors of the reciprocal space sum are evaluated in single precision, while the
+        potential is accumulated in the precision of the inputs. This roughly halves the
+        memory traffic of the dominant part of the calculation for ``float64`` inputs,
+        at the cost of a relative error of up to about ``1e-5`` in the long-range part.
+
+    The reciprocal space vectors only depend on the ``cell`` and on ``lr_wavelength``.
+    Since the cell often stays fixed in molecular dynamics or training loops, the
+    vectors generated for the last ``cell`` are cached and reused as long as the
+    ``cell`` does not change. The cache is bypassed if ``cell`` requires gradients, so
+    that derivatives with respect to the cell are always computed correctly.
+
+    Many small structures (e.g. a training batch) can be evaluated at once with
+    :meth:`forward_batch`, which avoids a separate reciprocal space sum for each of
+    them.
     """
 
     def __init__(
@@ -61,6 +84,8 @@ class EwaldCalculator(Calculator):
         lr_wavelength: float,
         full_neighbor_list: bool = False,
         prefactor: float = 1.0,
+        kvectors_chunk_size: int = 4096,
+        mixed_precision: bool = False,
     ):
         super().__init__(
             potential=potential,
@@ -73,24 +98,97 @@ class EwaldCalculator(Calculator):
             )
         self.lr_wavelength: float = lr_wavelength
 
-    def _compute_kspace(
-        self,
-        charges: torch.Tensor,
-        cell: torch.Tensor,
-        positions: torch.Tensor,
-    ) -> torch.Tensor:
+        if kvectors_chunk_size <= 0:
+            raise ValueError(
+                f"`kvectors_chunk_size` ({kvectors_chunk_size}) has to be positive"
+            )
+        self.kvectors_chunk_size: int = kvectors_chunk_size
+        self.mixed_precision: bool = mixed_precision
+
+        # TorchScript requires to initialize all attributes in __init__
+        self._cached_cell: torch.Tensor = torch.zeros(0)
+        self._cached_lr_wavelength: float = 0.0
+        self._cached_axis_kvectors: torch.Tensor = torch.zeros((0, 3))
+        self._cached_kindices: torch.Tensor = torch.zeros((0, 3), dtype=torch.long)
+        self._cached_knorm_sq: torch.Tensor = torch.zeros(0)
+        self._cached_ivolume: torch.Tensor = torch.zeros(0)
+
+    def _prepare_kvectors(
+        self, cell: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Returns the k-vectors used in the reciprocal space sum, their squared norms and
+        the inverse volume of the ``cell``, reusing the values from the previous call if
+        the ``cell`` and ``lr_wavelength`` did not change.
+
+        The k-vectors form a product grid ``k = kx + ky + kz``, with each term taken
+        along one of the reciprocal basis vectors. They are thus returned in factorized
+        form, as the concatenated ``(nx + ny + nz, 3)`` per-axis vectors and the
+        ``(n_kvectors, 3)`` indices of the three terms of each k-vector into them.
+        """
+        if (
+            not cell.requires_grad
+            and self.lr_wavelength == self._cached_lr_wavelength
+            and cell.device == self._cached_cell.device
+            and cell.dtype == self._cached_cell.dtype
+            and torch.equal(cell, self._cached_cell)
+        ):
+            return (
+                self._cached_axis_kvectors,
+                self._cached_kindices,
+                self._cached_knorm_sq,
+                self._cached_ivolume,
+            )
+
         # Define k-space cutoff from required real-space resolution
         k_cutoff = 2 * torch.pi / self.lr_wavelength
 
         # Compute number of times each basis vector of the reciprocal space can be
         # scaled until the cutoff is reached
-        basis_norms = torch.linalg.norm(cell, dim=1)
+        basis_norms = torch.sqrt(torch.sum(cell**2, dim=1))
         ns_float = k_cutoff * basis_norms / 2 / torch.pi
         ns = torch.ceil(ns_float).long()
 
-        # Generate k-vectors and evaluate
-        kvectors = generate_kvectors_for_ewald(ns=ns, cell=cell)
-        knorm_sq = torch.sum(kvectors**2, dim=1)
+        # Generate k-vectors and evaluate. The box spanned by `ns` is only used to
+        # enumerate the candidates: its corners may lie outside the sphere of radius
+        # `k_cutoff` (e.g. for strongly skewed cells) and are discarded to reduce the
+        # number of k-vectors entering the reciprocal space sum.
+        reciprocal_cell, volume = _reciprocal_cell(cell)
+        kxs, kys, kzs = _generate_kvector_axes(
+            reciprocal_cell=reciprocal_cell, ns=ns, for_ewald=True
+        )
+        knorm_sq = _kvectors_norm_sq(kxs, kys, kzs)
+        within_cutoff = knorm_sq <= k_cutoff**2
+        knorm_sq = knorm_sq[within_cutoff]
+
+        # `nonzero` gives the (x, y, z) grid indices of the kept k-vectors, which are
+        # offset to index into the concatenated per-axis vectors
+        kindices = torch.nonzero(within_cutoff)
+        kindices[:, 1] += kxs.shape[0]
+        kindices[:, 2] += kxs.shape[0] + kys.shape[0]
+        axis_kvectors = torch.cat([kxs, kys, kzs])
+
+        ivolume = torch.abs(volume).pow(-1)
+
+        # Tensors created in inference mode can not be reused in a later calculation
+        # that requires gradients, so these are not cached either
+        if not cell.requires_grad and not axis_kvectors.is_inference():
+            self._cached_cell = cell.clone()
+            self._cached_lr_wavelength = self.lr_wavelength
+            self._cached_axis_kvectors = axis_kvectors
+            self._cached_kindices = kindices
+            self._cached_knorm_sq = knorm_sq
+            self._cached_ivolume = ivolume
+
+        return axis_kvectors, kindices, knorm_sq, ivolume
+
+    def _compute_kspace(
+        self,
+        charges: torch.Tensor,
+        cell: torch.Tensor,
+        positions: torch.Tensor,
+    ) -> torch.Tensor:
+        axis_kvectors, kindices, knorm_sq, ivolume = self._prepare_kvectors(cell)
 
         # G(k) is the Fourier transform of the Coulomb potential
         # generated by a Gaussian charge density
@@ -98,20 +196,61 @@ class EwaldCalculator(Calculator):
         # value to be equal to zero. This mathematically corresponds
         # to the requirement that the net charge of the cell is zero.
         # G = 4 * torch.pi * torch.exp(-0.5 * smearing**2 * knorm_sq) / knorm_sq
-        G = self.potential.lr_from_k_sq(knorm_sq)
+        # The inverse volume prefactor of the reciprocal space sum is folded into G,
+        # which is much smaller than the per-atom output
+        G = self.potential.lr_from_k_sq(knorm_sq) * ivolume
 
         # Compute the energy using the explicit method that
         # follows directly from the Poisson summation formula.
-        # For this, we precompute trigonometric factors for optimization, which leads
-        # to N^2 rather than N^3 scaling.
-        trig_args = kvectors @ (positions.T)  # [k, i]
+        # With `mixed_precision`, the intermediates are evaluated in single precision
+        # while the potential is still accumulated in the precision of the inputs.
+        phase_dtype = torch.float32 if self.mixed_precision else positions.dtype
+        axis_kvectors = axis_kvectors.to(phase_dtype)
+        G = G.to(phase_dtype)
+        positions_phase = positions.to(phase_dtype)
+
+        # The phase factors factorize along the reciprocal basis vectors as
+        # exp(i k.r_j) = exp(i kx.r_j) exp(i ky.r_j) exp(i kz.r_j), so that only the
+        # (nx + ny + nz) per-axis factors have to be evaluated with trigonometric
+        # functions, rather than one for each of the nx * ny * nz k-vectors.
+        axis_trig_args = axis_kvectors @ (positions_phase.T)  # [nx + ny + nz, i]
+        axis_phases = torch.polar(torch.ones_like(axis_trig_args), axis_trig_args)
+        charges_phase = charges.to(axis_phases.dtype)
 
-        c = torch.cos(trig_args)  # [k, i]
-        s = torch.sin(trig_args)  # [k, i]
-        sc = torch.stack([c, s], dim=0)  # [2 "f", k, i]
-        sc_summed_G = torch.einsum("fki,ic, k->fkc", sc, charges, G)
-        energy = torch.einsum("fkc,fki->ic", sc_summed_G, sc)
-        energy /= torch.abs(cell.det())
+        # The sum over k is accumulated in chunks to bound the memory used by the
+        # [k, i] intermediates. When the phases have the precision of the inputs, the
+        # chunks are accumulated directly in the complex dtype of the phases.
+        # Otherwise, the real part of each chunk is accumulated in the precision of
+        # the inputs.
+        accumulate_phase = phase_dtype == charges.dtype
+        energy = torch.zeros_like(charges)
+        energy_phase = torch.zeros_like(charges_phase)
+        for k_start in range(0, kindices.shape[0], self.kvectors_chunk_size):
+            k_stop = k_start + self.kvectors_chunk_size
+            chunk_kindices = kindices[k_start:k_stop]
+
+            # the products are accumulated in-place in the gathered tensor, to avoid
+            # allocating further [k, i] temporaries
+            phases = axis_phases[chunk_kindices[:, 0]]  # [k, i]
+            phases *= axis_phases[chunk_kindices[:, 1]]
+            phases *= axis_phases[chunk_kindices[:, 2]]
+
+            # The structure factor S(k) = sum_j q_j exp(i k.r_j) is a single matrix
+            # product, and the potential is the real part of
+            # sum_k G(k) S(k) exp(-i k.r_i)
+            structure_factor = phases @ charges_phase  # [k, c]
+            G_structure_factor = G[k_start:k_stop].unsqueeze(-1) * structure_factor
+            if accumulate_phase:
+                # a single fused matrix product and addition
+                energy_phase = torch.addmm(
+                    energy_phase, phases.conj().T, G_structure_factor
+                )
+            else:
+                energy += torch.real(torch.mm(phases.conj().T, G_structure_factor)).to(
+                    charges.dtype
+                )
+        if accumulate_phase:
+            energy = torch.real(energy_phase).to(charges.dtype)
 
         # Remove the self-contribution: Using the Coulomb potential as an
         # example, this is the potential generated at the origin by the fictituous
@@ -126,10 +265,211 @@ class EwaldCalculator(Calculator):
         # is present to make the cell neutral. In this case, the potential has to be
         # adjusted to compensate for this.
         # An extra factor of 2 is added to compensate for the division by 2 later on
-        ivolume = torch.abs(cell.det()).pow(-1)
         charge_tot = torch.sum(charges, dim=0)
         prefac = self.potential.background_correction()
         energy -= 2 * prefac * charge_tot * ivolume
 
         # Compensate for double counting of pairs (i,j) and (j,i)
         return energy / 2
+
+    @torch.jit.export
+    def forward_batch(
+        self,
+        charges: torch.Tensor,
+        cell: torch.Tensor,
+        positions: torch.Tensor,
+        neighbor_indices: torch.Tensor,
+        neighbor_distances: torch.Tensor,
+        batch: torch.Tensor,
+    ) -> torch.Tensor:
+        r"""
+        Compute the potential "energy" for several structures at once.
+
+        The atoms of all structures are concatenated, and ``batch`` gives the index of
+        the structure each atom belongs to. The reciprocal space sum of all structures
+        is evaluated together on a common grid of k-vectors, in which the vectors
+        outside of the range of a given structure are masked. This is equivalent to, but
+        faster than, calling :meth:`forward` separately for many small structures.
+
+        :param charges: torch.Tensor of shape ``(n_atoms, n_channels)``, atomic
+            (pseudo-)charges of all structures
+        :param cell: torch.Tensor of shape ``(n_structures, 3, 3)``, periodic supercells
+            of the structures
+        :param positions: torch.Tensor of shape ``(n_atoms, 3)``, Cartesian coordinates
+            of the atoms of all structures
+        :param neighbor_indices: torch.Tensor with the ``i,j`` indices of neighbors for
+            which the potential should be computed in real space. The indices refer to
+            the concatenated atoms, and pairs can not span different structures.
+        :param neighbor_distances: torch.Tensor with the pair distances of the neighbors
+            for which the potential should be computed in real space.
+        :param batch: torch.Tensor of shape ``(n_atoms,)`` and dtype ``torch.int32`` or
+            ``torch.int64``, containing the index of the structure of each atom, between
+            ``0`` and ``n_structures - 1``
+        """
+        if cell.dim() != 3 or list(cell.shape[1:]) != [3, 3]:
+            raise ValueError(
+                "`cell` must be a tensor with shape [n_structures, 3, 3], got tensor "
+                f"with shape {list(cell.shape)}"
+            )
+
+        n_structures = cell.shape[0]
+        if n_structures == 0:
+            raise ValueError(
+                "`cell` must contain at least one structure, got tensor with shape "
+                f"{list(cell.shape)}"
+            )
+
+        if list(batch.shape) != [len(positions)]:
+            raise ValueError(
+                "`batch` must be a tensor with shape [n_atoms], got tensor with shape "
+                f"{list(batch.shape)}"
+            )
+
+        if batch.dtype != torch.int64 and batch.dtype != torch.int32:
+            raise ValueError(
+                f"type of `batch` ({batch.dtype}) must be torch.int32 or torch.int64"
+            )
+
+        if batch.device != positions.device:
+            raise ValueError(
+                f"device of `batch` ({batch.device}) must be same as `positions` "
+                f"({positions.device})"
+            )
+
+        if len(batch) > 0:
+            batch_min = int(batch.min())
+            batch_max = int(batch.max())
+            if batch_min < 0 or batch_max >= n_structures:
+                raise ValueError(
+                    f"`batch` must contain indices between 0 and {n_structures - 1} "
+                    f"for {n_structures} structure(s), got values between {batch_min} "
+                    f"and {batch_max}"
+                )
+
+        # all other inputs have the same requirements as for a single structure
+        self._validate_compute_parameters(
+            charges=charges,
+            cell=cell[0],
+            positions=positions,
+            neighbor_indices=neighbor_indices,
+            neighbor_distances=neighbor_distances,
+        )
+
+        # The neighbor indices refer to the concatenated atoms, so the real space sum
+        # does not need to know about the structures
+        potential_sr = self._compute_rspace(
+            charges=charges,
+            neighbor_indices=neighbor_indices,
+            neighbor_distances=neighbor_distances,
+        )
+
+        potential_lr = self._compute_kspace_batch(
+            charges=charges,
+            cell=cell,
+            positions=positions,
+            batch=batch,
+        )
+
+        return self.prefactor * (potential_sr + potential_lr)
+
+    def _compute_kspace_batch(
+        self,
+        charges: torch.Tensor,
+        cell: torch.Tensor,
+        positions: torch.Tensor,
+        batch: torch.Tensor,
+    ) -> torch.Tensor:
+        n_structures = cell.shape[0]
+
+        # Same k-space cutoff and number of k-vectors along each reciprocal basis vector
+        # as in `_prepare_kvectors`, separately for each structure
+        k_cutoff = 2 * torch.pi / self.lr_wavelength
+        basis_norms = torch.sqrt(torch.sum(cell**2, dim=2))  # [s, 3]
+        ns = torch.ceil(k_cutoff * basis_norms / 2 / torch.pi).long()
+
+        # The common grid contains the integer coordinates along the reciprocal basis
+        # vectors used by any of the structures, following the FFT convention of
+        # `generate_kvectors_for_ewald` for the frequencies. The vectors outside of the
+        # range or cutoff of a structure are masked for that structure, and the ones
+        # that are masked for all structures are discarded.
+        ns_max = torch.max(ns, dim=0).values
+        nx = int(ns_max[0])
+        ny = int(ns_max[1])
+        nz = int(ns_max[2])
+        frequencies = torch.cartesian_prod(
+            torch.arange(-(nx // 2), (nx + 1) // 2, device=cell.device),
+            torch.arange(-(ny // 2), (ny + 1) // 2, device=cell.device),
+            torch.arange(-(nz // 2), (nz + 1) // 2, device=cell.device),
+        )  # [k, 3]
+        within_range = torch.all(
+            (frequencies >= -(ns // 2).unsqueeze(1))
+            & (frequencies <= ((ns - 1) // 2).unsqueeze(1)),
+            dim=-1,
+        )  # [s, k]
+
+        reciprocal_cell, volume = _reciprocal_cell(cell)  # [s, 3, 3], [s]
+        kvectors = frequencies.to(cell.dtype) @ reciprocal_cell  # [s, k, 3]
+        knorm_sq = torch.sum(kvectors**2, dim=-1)  # [s, k]
+        keep = within_range & (knorm_sq <= k_cutoff**2)
+
+        used = torch.any(keep, dim=0)
+        frequencies = frequencies[used]
+        knorm_sq = knorm_sq[:, used]
+        keep = keep[:, used]
+
+        # G(k) of each structure, including the inverse volume, see `_compute_kspace`
+        ivolume = torch.abs(volume).pow(-1)
+        G = self.potential.lr_from_k_sq(knorm_sq) * ivolume.unsqueeze(-1)
+        G = torch.where(keep, G, torch.zeros_like(G))
+
+        phase_dtype = torch.float32 if self.mixed_precision else positions.dtype
+        G = G.to(phase_dtype)
+        frequencies = frequencies.to(phase_dtype)
+
+        # With k = sum_a m_a b_a, the phases are k.r_j = sum_a m_a (b_a.r_j), so only
+        # the projections of the positions on the reciprocal basis vectors of their own
+        # structure are needed
+        projections = torch.bmm(
+            reciprocal_cell[batch], positions.unsqueeze(-1)
+        ).squeeze(-1)  # [i, 3]
+        projections = projections.to(phase_dtype)
+
+        charges_phase = charges.to(phase_dtype)
+        charges_phase = torch.complex(charges_phase, torch.zeros_like(charges_phase))
+
+        energy = torch.zeros_like(charges)
+        for k_start in range(0, frequencies.shape[0], self.kvectors_chunk_size):
+            k_stop = k_start + self.kvectors_chunk_size
+            trig_args = frequencies[k_start:k_stop] @ (projections.T)  # [k, i]
+            phases = torch.polar(torch.ones_like(trig_args), trig_args).T  # [i, k]
+
+            # structure factors of each structure, from the atoms that belong to it
+            structure_factor = torch.zeros(
+                (n_structures, phases.shape[1], charges.shape[1]),
+                dtype=phases.dtype,
+                device=phases.device,
+            )
+            structure_factor.index_add_(
+                0, batch, phases.unsqueeze(-1) * charges_phase.unsqueeze(1)
+            )  # [s, k, c]
+            G_structure_factor = G[:, k_start:k_stop].unsqueeze(-1) * structure_factor
+
+            # each atom only sees the structure factor of its own structure, contracted
+            # over k for all charge channels at once, and is accumulated in the
+            # precision of the inputs
+            energy_chunk = torch.einsum(
+                "ik,ikc->ic", phases.conj(), G_structure_factor[batch]
+            )
+            energy += torch.real(energy_chunk).to(charges.dtype)
+
+        # self-contribution and background correction, see `_compute_kspace`
+        energy -= charges * self.potential.self_contribution()
+
+        charge_tot = torch.zeros(
+            (n_structures, charges.shape[1]), dtype=charges.dtype, device=charges.device
+        )
+        charge_tot.index_add_(0, batch, charges)
+        prefac = self.potential.background_correction()
+        energy -= 2 * prefac * charge_tot[batch] * ivolume[batch].unsqueeze(-1)
+
+        return energy / 2
@@ -3,7 +3,7 @@ from typing import Optional
 import torch
 
 # from ..potentials import Potential
-from .kvectors import generate_kvectors_for_mesh
+from .kvectors import _generate_kvector_axes, _kvectors_norm_sq, _reciprocal_cell
 
 
 class KSpaceKernel(torch.nn.Module):
@@ -212,8 +212,14 @@ class KSpaceFilter(torch.nn.Module):
             )
 
         if cell is not None or ns_mesh is not None:
-            self._kvectors = generate_kvectors_for_mesh(ns=self.ns_mesh, cell=self.cell)
-            self._k_sq = torch.linalg.norm(self._kvectors, dim=3) ** 2
+            reciprocal_cell, _ = _reciprocal_cell(self.cell)
+            kxs, kys, kzs = _generate_kvector_axes(
+                reciprocal_cell=reciprocal_cell, ns=self.ns_mesh, for_ewald=False
+            )
+            self._kvectors = (
+                kxs[:, None, None] + kys[None, :, None] + kzs[None, None, :]
+            )
+            self._k_sq = _kvectors_norm_sq(kxs, kys, kzs)
 
 
 class P3MKSpaceFilter(KSpaceFilter):
@@ -299,7 +305,7 @@ class P3MKSpaceFilter(KSpaceFilter):
         ) * self.kernel.kernel_from_k_sq(self._k_sq)
 
     def _compute_influence(self, kvectors: torch.Tensor) -> torch.Tensor:
-        cell_dimensions = torch.linalg.norm(self.cell, dim=1)
+        cell_dimensions = torch.sqrt(torch.sum(self.cell**2, dim=1))
         actual_mesh_spacing = (cell_dimensions / self.ns_mesh).reshape(1, 1, 1, 3)
 
         kh = kvectors * actual_mesh_spacing
@@ -310,7 +316,7 @@ class P3MKSpaceFilter(KSpaceFilter):
             return torch.where(U2 == 0, 0.0, torch.reciprocal(masked))
 
         D = self._differential_operator(kh, actual_mesh_spacing)
-        D_to_4mode = torch.linalg.norm(D, dim=-1) ** (4 * self.mode)
+        D_to_4mode = torch.sum(D**2, dim=-1) ** (2 * self.mode)
 
         # Calculate (part of) the kernel See eq.30 of this paper
         # https://doi.org/10.1063/1.3000389 for your main reference, as well as the
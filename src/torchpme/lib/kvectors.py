@@ -14,11 +14,112 @@ def get_ns_mesh(cell: torch.Tensor, mesh_spacing: float):
 
     :return: torch.tensor of length 3 containing the mesh size
     """
-    basis_norms = torch.linalg.norm(cell, dim=1)
+    basis_norms = torch.sqrt(torch.sum(cell**2, dim=1))
     ns_approx = basis_norms / mesh_spacing
     ns_actual_approx = 2 * ns_approx + 1  # actual number of mesh points
     # ns = [nx, ny, nz], closest power of 2 (helps for FT efficiency)
-    return torch.tensor(2).pow(torch.ceil(torch.log2(ns_actual_approx)).long())
+    return torch.pow(2, torch.ceil(torch.log2(ns_actual_approx)).long())
+
+
+def _reciprocal_cell(cell: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    r"""
+    Reciprocal basis vectors and (signed) volume of one or several cells.
+
+    The reciprocal basis vectors :math:`\mathbf{b}_1 = 2\pi (\mathbf{a}_2 \times
+    \mathbf{a}_3) / V` (and cyclic permutations) are built from cross products, which
+    is cheaper than inverting the cell, never synchronizes with the CPU, and gives the
+    volume :math:`V = \mathbf{a}_1 \cdot (\mathbf{a}_2 \times \mathbf{a}_3)` for
+    free.
+
+    :param cell: torch.tensor of shape ``(..., 3, 3)``, where ``cell[..., i, :]`` is
+        the i-th basis vector
+    :return: the reciprocal cell of shape ``(..., 3, 3)``, where
+        ``reciprocal_cell[..., i, :]`` is the i-th reciprocal basis vector, and the
+        volume of shape ``(...)``
+    """
+    a1 = cell[..., 0, :]
+    a2 = cell[..., 1, :]
+    a3 = cell[..., 2, :]
+    a2_a3 = torch.linalg.cross(a2, a3)
+    volume = torch.sum(a1 * a2_a3, dim=-1)
+
+    reciprocal_cell = torch.stack(
+        [a2_a3, torch.linalg.cross(a3, a1), torch.linalg.cross(a1, a2)], dim=-2
+    )
+    return reciprocal_cell * (2 * torch.pi / volume)[..., None, None], volume
+
+
+def _signed_indices(n: int, device: torch.device, dtype: torch.dtype) -> torch.Tensor:
+    """
+    Signed integer frequencies ``[0, 1, ..., -2, -1]`` of a FFT of length ``n``.
+
+    This is the same as ``n * torch.fft.fftfreq(n)``, but built directly from the
+    integer indices, so that the values are exact.
+    """
+    indices = torch.arange(n, device=device, dtype=dtype)
+    return torch.where(indices < (n + 1) // 2, indices, indices - n)
+
+
+def _generate_kvector_axes(
+    reciprocal_cell: torch.Tensor, ns: torch.Tensor, for_ewald: bool
+) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Reciprocal space vectors along each of the three reciprocal basis vectors.
+
+    Every reciprocal space vector of the grid is the sum of one vector from each of the
+    returned tensors, of shapes ``(nx, 3)``, ``(ny, 3)`` and ``(nz, 3)`` (or
+    ``(nz // 2 + 1, 3)`` for mesh based calculators).
+
+    Contrary to the public generators, the inputs are not validated: this is meant to
+    be used in the hot path of callers that already checked the shapes and devices of
+    ``cell`` and ``ns``.
+    """
+    bx = reciprocal_cell[0]
+    by = reciprocal_cell[1]
+    bz = reciprocal_cell[2]
+
+    # Generate all reciprocal space vectors from real FFT!
+    # The integer frequencies along each axis are [0, 1, 2, ..., -2, -1], in the same
+    # order as `n * torch.fft.fftfreq(n)` (or [0, 1, ..., n // 2] for the real FFT along
+    # the last axis), and are then multiplied with the reciprocal space vectors
+    device = reciprocal_cell.device
+    dtype = reciprocal_cell.dtype
+    kxs = bx * _signed_indices(int(ns[0]), device, dtype).unsqueeze(-1)
+    kys = by * _signed_indices(int(ns[1]), device, dtype).unsqueeze(-1)
+
+    if for_ewald:
+        kzs = bz * _signed_indices(int(ns[2]), device, dtype).unsqueeze(-1)
+    else:
+        kzs = bz * torch.arange(
+            int(ns[2]) // 2 + 1, device=device, dtype=dtype
+        ).unsqueeze(-1)
+
+    return kxs, kys, kzs
+
+
+def _kvectors_norm_sq(
+    kxs: torch.Tensor, kys: torch.Tensor, kzs: torch.Tensor
+) -> torch.Tensor:
+    """
+    Squared norms of all reciprocal space vectors of the grid spanned by the per-axis
+    vectors ``kxs``, ``kys`` and ``kzs`` of :func:`_generate_kvector_axes`.
+
+    Expanding :math:`|k_x + k_y + k_z|^2`, the norms are assembled from the (small)
+    per-axis squared norms and cross products, without reading the full grid of
+    k-vectors again.
+    """
+    kxs_sq = torch.sum(kxs**2, dim=1)
+    kys_sq = torch.sum(kys**2, dim=1)
+    kzs_sq = torch.sum(kzs**2, dim=1)
+
+    return (
+        kxs_sq[:, None, None]
+        + kys_sq[None, :, None]
+        + kzs_sq[None, None, :]
+        + 2 * (kxs @ kys.T)[:, :, None]
+        + 2 * (kxs @ kzs.T)[:, None, :]
+        + 2 * (kys @ kzs.T)[None, :, :]
+    )
 
 
 def _generate_kvectors(
@@ -38,36 +139,10 @@ def _generate_kvectors(
             f"{cell.device}."
         )
 
-    if cell.is_cuda:
-        # use function that does not synchronize with the CPU
-        inverse_cell = torch.linalg.inv_ex(cell)[0]
-    else:
-        inverse_cell = torch.linalg.inv(cell)
-
-    reciprocal_cell = 2 * torch.pi * inverse_cell.T
-    bx = reciprocal_cell[0]
-    by = reciprocal_cell[1]
-    bz = reciprocal_cell[2]
-
-    # Generate all reciprocal space vectors from real FFT!
-    # The frequencies from the fftfreq function  are of the form [0, 1/n, 2/n, ...]
-    # These are then converted to [0, 1, 2, ...] by multiplying with n.
-    # get the frequencies, multiply with n, then w/ the reciprocal space vectors
-    kxs = (bx * ns[0]) * torch.fft.fftfreq(
-        ns[0], device=cell.device, dtype=cell.dtype
-    ).unsqueeze(-1)
-    kys = (by * ns[1]) * torch.fft.fftfreq(
-        ns[1], device=cell.device, dtype=cell.dtype
-    ).unsqueeze(-1)
-
-    if for_ewald:
-        kzs = (bz * ns[2]) * torch.fft.fftfreq(
-            ns[2], device=cell.device, dtype=cell.dtype
-        ).unsqueeze(-1)
-    else:
-        kzs = (bz * ns[2]) * torch.fft.rfftfreq(
-            ns[2], device=cell.device, dtype=cell.dtype
-        ).unsqueeze(-1)
+    reciprocal_cell, _ = _reciprocal_cell(cell)
+    kxs, kys, kzs = _generate_kvector_axes(
+        reciprocal_cell=reciprocal_cell, ns=ns, for_ewald=for_ewald
+    )
 
     # then take the cartesian product (all possible combinations, same as meshgrid)
     # via broadcasting (to avoid instantiating intermediates), and sum up
@@ -2,6 +2,91 @@ from typing import Optional
 
 import torch
 
+# Coefficients of the polynomials giving the 1D interpolation weights of each node as a
+# function of the relative position ``x`` of a point. For each number of nodes, the
+# weight of the ``i``-th node is ``sum_k numerators[i][k] * x**k / denominators[i]``.
+_P3M_WEIGHT_POLYNOMIALS = {
+    1: ([1], [[1]]),
+    2: ([2, 2], [[1, -2], [1, 2]]),
+    3: ([8, 4, 8], [[1, -4, 4], [3, 0, -4], [1, 4, 4]]),
+    4: (
+        [48, 48, 48, 48],
+        [[1, -6, 12, -8], [23, -30, -12, 24], [23, 30, -12, -24], [1, 6, 12, 8]],
+    ),
+    5: (
+        [384, 96, 192, 96, 384],
+        [
+            [1, -8, 24, -32, 16],
+            [19, -44, 24, 16, -16],
+            [115, 0, -120, 0, 48],
+            [19, 44, 24, -16, -16],
+            [1, 8, 24, 32, 16],
+        ],
+    ),
+}
+
+_LAGRANGE_WEIGHT_POLYNOMIALS = {
+    3: ([2, 2, 2], [[0, -1, 1], [2, 0, -2], [0, 1, 1]]),
+    4: (
+        [48, 48, 48, 48],
+        [[-3, 2, 12, -8], [27, -54, -12, 24], [27, 54, -12, -24], [-3, -2, 12, 8]],
+    ),
+    5: (
+        [24, 24, 24, 24, 24],
+        [
+            [0, 2, -1, -2, 1],
+            [0, -16, 16, 4, -4],
+            [24, 0, -30, 0, 6],
+            [0, 16, 16, -4, -4],
+            [0, -2, -1, 2, 1],
+        ],
+    ),
+    6: (
+        [3840, 3840, 3840, 3840, 3840, 3840],
+        [
+            [45, -18, -200, 80, 80, -32],
+            [-375, 250, 1560, -1040, -240, 160],
+            [2250, -4500, -1360, 2720, 160, -320],
+            [2250, 4500, -1360, -2720, 160, 320],
+            [-375, -250, 1560, 1040, -240, -160],
+            [45, 18, -200, -80, 80, 32],
+        ],
+    ),
+    7: (
+        [720, 720, 720, 720, 720, 720, 720],
+        [
+            [0, -12, 4, 15, -5, -3, 1],
+            [0, 108, -54, -120, 60, 12, -6],
+            [0, -540, 540, 195, -195, -15, 15],
+            [720, 0, -980, 0, 280, 0, -20],
+            [0, 540, 540, -195, -195, 15, 15],
+            [0, -108, -54, 120, 60, -12, -6],
+            [0, 12, 4, -15, -5, 3, 1],
+        ],
+    ),
+}
+
+
+def _weight_coefficients(
+    method: str, interpolation_nodes: int, dtype: torch.dtype, device: torch.device
+) -> torch.Tensor:
+    """
+    Coefficient matrix of shape ``(interpolation_nodes, interpolation_nodes)`` of the
+    1D weight polynomials, or an empty tensor if the number of nodes is not supported.
+    """
+    if method == "P3M":
+        polynomials = _P3M_WEIGHT_POLYNOMIALS
+    else:
+        polynomials = _LAGRANGE_WEIGHT_POLYNOMIALS
+
+    if interpolation_nodes not in polynomials:
+        return torch.zeros((0, 0), dtype=dtype, device=device)
+
+    denominators, numerators = polynomials[interpolation_nodes]
+    coefficients = torch.tensor(numerators, dtype=torch.float64)
+    coefficients /= torch.tensor(denominators, dtype=torch.float64).unsqueeze(1)
+    return coefficients.to(dtype=dtype, device=device)
+
 
 class MeshInterpolator(torch.nn.Module):
     """
@@ -36,6 +121,15 @@ class MeshInterpolator(torch.nn.Module):
         For P3M interpolation, only the values ``1, 2, 3, 4, 5`` are supported.
     :param method: str
         The interpolation method to use. Either "Lagrange" or "P3M".
+    :param weights_dtype: Optional floating point dtype in which the interpolation
+        weights are stored, e.g. :obj:`torch.bfloat16` or :obj:`torch.float32` for a
+        ``float64`` cell. It can not be wider than the dtype of the cell. The weights are still evaluated in the precision of the cell,
+        and they are promoted back to that precision when they are multiplied with the
+        particle weights or the mesh values. Lowering the precision of the weights
+        reduces the memory used to store them between :py:meth:`compute_weights` and
+        the interpolation, at the cost of a relative error of the order of the
+        resolution of ``weights_dtype``. It does not make the interpolation itself
+        faster. By default, the dtype of the cell is used.
     """
 
     def __init__(
@@ -44,6 +138,7 @@ class MeshInterpolator(torch.nn.Module):
         ns_mesh: torch.Tensor,
         interpolation_nodes: int,
         method: str,
+        weights_dtype: Optional[torch.dtype] = None,
     ):
         super().__init__()
 
@@ -52,21 +147,42 @@ class MeshInterpolator(torch.nn.Module):
                 f"method '{method}' is not supported. Choose from 'Lagrange' or 'P3M'"
             )
 
+        if weights_dtype is not None and not weights_dtype.is_floating_point:
+            raise ValueError(
+                f"`weights_dtype` {weights_dtype} has to be a floating point dtype"
+            )
+
+        self._reduced_weights_precision: bool = weights_dtype is not None
+        self._weights_dtype: torch.dtype = (
+            weights_dtype if weights_dtype is not None else cell.dtype
+        )
+
         self.method: str = method
         self.interpolation_nodes: int = interpolation_nodes
 
+        # the weight polynomials and the offsets of the nodes only depend on
+        # `interpolation_nodes`, and are moved to the device of the `cell` when calling
+        # `update`. The coefficients are kept in double precision on the CPU, so that
+        # they can be converted to the dtype of any later `cell` without losing
+        # precision
+        self._weight_coefficients_float64 = _weight_coefficients(
+            method, interpolation_nodes, torch.float64, torch.device("cpu")
+        )
+        self._weight_coefficients = self._weight_coefficients_float64.to(
+            dtype=cell.dtype, device=cell.device
+        )
+        self._center_offsets = self._compute_center_offsets(cell.device)
+        self._mesh_shape: list[int] = [0, 0, 0]
         self.update(cell, ns_mesh)
 
         # TorchScript requires to initialize all attributes in __init__
         self.interpolation_weights: torch.Tensor = torch.zeros(
             1, device=self._device, dtype=self._dtype
         )
-        self.x_shifts: torch.Tensor = torch.zeros(1, device=self._device)
-        self.y_shifts: torch.Tensor = torch.zeros(1, device=self._device)
-        self.z_shifts: torch.Tensor = torch.zeros(1, device=self._device)
-        self.x_indices: torch.Tensor = torch.zeros(1, device=self._device)
-        self.y_indices: torch.Tensor = torch.zeros(1, device=self._device)
-        self.z_indices: torch.Tensor = torch.zeros(1, device=self._device)
+        self.flat_indices: torch.Tensor = torch.zeros(1, device=self._device)
+        self._weight_product: torch.Tensor = torch.zeros(
+            1, device=self._device, dtype=self._dtype
+        )
 
     def update(
         self,
@@ -90,16 +206,31 @@ class MeshInterpolator(torch.nn.Module):
                 raise ValueError(
                     f"cell of shape {list(cell.shape)} should be of shape (3, 3)"
                 )
+            # the products with the weights are promoted to the dtype of the cell
+            if (
+                self._reduced_weights_precision
+                and torch.promote_types(self._weights_dtype, cell.dtype) != cell.dtype
+            ):
+                raise ValueError(
+                    f"`weights_dtype` {self._weights_dtype} can not be wider than the "
+                    f"dtype {cell.dtype} of `cell`"
+                )
             self.cell = cell
-            self.inverse_cell = cell.clone()
             self._dtype = cell.dtype
             self._device = cell.device
 
-            if self.cell.is_cuda:
-                # use function that does not synchronize with the CPU
-                self.inverse_cell = torch.linalg.inv_ex(cell)[0]
-            else:
-                self.inverse_cell = torch.linalg.inv(cell)
+            # use function that does not synchronize with the CPU to check for errors
+            self.inverse_cell = torch.linalg.inv_ex(cell)[0]
+
+            if (
+                self._weight_coefficients.dtype != self._dtype
+                or self._weight_coefficients.device != self._device
+            ):
+                self._weight_coefficients = self._weight_coefficients_float64.to(
+                    dtype=self._dtype, device=self._device
+                )
+            if self._center_offsets.device != self._device:
+                self._center_offsets = self._compute_center_offsets(self._device)
 
         if ns_mesh is not None:
             if ns_mesh.shape != (3,):
@@ -107,6 +238,11 @@ class MeshInterpolator(torch.nn.Module):
                     f"shape {list(ns_mesh.shape)} of `ns_mesh` has to be (3,)"
                 )
             self.ns_mesh = ns_mesh
+            # integer copy used to compute the indices of the mesh points
+            self._ns_mesh_long = ns_mesh.to(torch.int64)
+            # the mesh shape as Python ints is only read back from `ns_mesh` when it is
+            # first needed, see `_get_mesh_shape`
+            self._mesh_shape = [0, 0, 0]
 
         if self.cell.device != self.ns_mesh.device:
             raise ValueError(
@@ -114,16 +250,49 @@ class MeshInterpolator(torch.nn.Module):
                 f"{self.cell.device} and {self.ns_mesh.device}"
             )
 
+        # maps Cartesian positions to positions in units of the mesh spacing
+        self._scaled_inverse_cell = self.inverse_cell * self.ns_mesh
+
+        # the positions of the mesh points are recomputed by `get_mesh_xyz` when needed
+        self._mesh_xyz = torch.zeros(0, dtype=self._dtype, device=self._device)
+
+    def _compute_center_offsets(self, device: torch.device) -> torch.Tensor:
+        """
+        Offsets of the interpolation nodes of each point along each axis, with respect
+        to its closest mesh point.
+        """
+        return torch.arange(
+            1 - (self.interpolation_nodes + 1) // 2,
+            1 + self.interpolation_nodes // 2,
+            device=device,
+        )
+
+    def _get_mesh_shape(self) -> list[int]:
+        """
+        Number of mesh points along the three axes as Python ints. The values are
+        cached, so that the device is only synchronized with the host once for each
+        ``ns_mesh``.
+        """
+        if self._mesh_shape[0] == 0:
+            mesh_shape: list[int] = self._ns_mesh_long.tolist()
+            self._mesh_shape = mesh_shape
+        return self._mesh_shape
+
     def get_mesh_xyz(self) -> torch.Tensor:
         """
         Returns the Cartesian positions of the mesh points.
 
+        The positions are cached, and only recomputed after a call to :py:meth:`update`.
+        Successive calls therefore return the same tensor, which must not be modified
+        in place.
+
         :return: torch.tensor of shape ``(nx, ny, nz, 3)``
             containing the positions of the grid points
         """
-        nx = self.ns_mesh[0]
-        ny = self.ns_mesh[1]
-        nz = self.ns_mesh[2]
+        if self._mesh_xyz.numel() > 0:
+            return self._mesh_xyz
+
+        nx, ny, nz = self._get_mesh_shape()
 
         grid_scaled = torch.stack(
             torch.meshgrid(
@@ -134,7 +303,17 @@ class MeshInterpolator(torch.nn.Module):
             ),
             dim=-1,
         )
-        return torch.matmul(grid_scaled, self.cell)
+        mesh_xyz = torch.matmul(grid_scaled.reshape(-1, 3), self.cell)
+        mesh_xyz = mesh_xyz.reshape(nx, ny, nz, 3)
+
+        # the positions are cached until the next `update`, unless they depend on a
+        # cell requiring gradients, in which case each call builds a new graph.
+        # Tensors created in inference mode can not be reused in a later calculation
+        # that requires gradients, so these are not cached either
+        if not self.cell.requires_grad and not mesh_xyz.is_inference():
+            self._mesh_xyz = mesh_xyz
+
+        return mesh_xyz
 
     def _compute_1d_weights(self, x: torch.Tensor) -> torch.Tensor:
         if self.method == "Lagrange":
@@ -157,47 +336,10 @@ class MeshInterpolator(torch.nn.Module):
         :return: torch.tensor of shape ``(interpolation_nodes, n)``
             Interpolation weights
         """
-        # Compute weights based on the given interpolation_nodes
-        if self.interpolation_nodes == 1:
-            return torch.ones(
-                (1, x.shape[0], x.shape[1]), dtype=self._dtype, device=self._device
-            )
-        if self.interpolation_nodes == 2:
-            return torch.stack([0.5 * (1 - 2 * x), 0.5 * (1 + 2 * x)])
-
-        x2 = x * x
-        if self.interpolation_nodes == 3:
-            return torch.stack(
-                [
-                    1 / 8 * (1 - 4 * x + 4 * x2),
-                    1 / 4 * (3 - 4 * x2),
-                    1 / 8 * (1 + 4 * x + 4 * x2),
-                ]
-            )
+        if self.interpolation_nodes < 1 or self.interpolation_nodes > 5:
+            raise ValueError("Only `interpolation_nodes` from 1 to 5 are allowed")
 
-        x3 = x * x2
-        if self.interpolation_nodes == 4:
-            return torch.stack(
-                [
-                    1 / 48 * (1 - 6 * x + 12 * x2 - 8 * x3),
-                    1 / 48 * (23 - 30 * x - 12 * x2 + 24 * x3),
-                    1 / 48 * (23 + 30 * x - 12 * x2 - 24 * x3),
-                    1 / 48 * (1 + 6 * x + 12 * x2 + 8 * x3),
-                ]
-            )
-
-        x4 = x * x3
-        if self.interpolation_nodes == 5:
-            return torch.stack(
-                [
-                    1 / 384 * (1 - 8 * x + 24 * x2 - 32 * x3 + 16 * x4),
-                    1 / 96 * (19 - 44 * x + 24 * x2 + 16 * x3 - 16 * x4),
-                    1 / 192 * (115 - 120 * x2 + 48 * x4),
-                    1 / 96 * (19 + 44 * x + 24 * x2 - 16 * x3 - 16 * x4),
-                    1 / 384 * (1 + 8 * x + 24 * x2 + 32 * x3 + 16 * x4),
-                ]
-            )
-        raise ValueError("Only `interpolation_nodes` from 1 to 5 are allowed")
+        return self._evaluate_weight_polynomials(x)
 
     def _compute_1d_weights_Lagrange(self, x: torch.Tensor) -> torch.Tensor:
         """
@@ -213,82 +355,38 @@ class MeshInterpolator(torch.nn.Module):
         :return: torch.tensor of shape ``(interpolation_nodes, n)``
             Interpolation weights
         """
-        # Compute weights based on the given interpolation_nodes
-        x2 = x * x
-        if self.interpolation_nodes == 3:
-            return torch.stack(
-                [
-                    1 / 2 * (-x + x2),
-                    1 / 2 * (2 - 2 * x2),
-                    1 / 2 * (x + x2),
-                ]
-            )
+        if self.interpolation_nodes < 3 or self.interpolation_nodes > 7:
+            raise ValueError("Only `interpolation_nodes` from 3 to 7 are allowed")
 
-        x3 = x * x2
-        if self.interpolation_nodes == 4:
-            return torch.stack(
-                [
-                    1 / 48 * (-3 + 2 * x + 12 * x2 - 8 * x3),
-                    1 / 48 * (27 - 54 * x - 12 * x2 + 24 * x3),
-                    1 / 48 * (27 + 54 * x - 12 * x2 - 24 * x3),
-                    1 / 48 * (-3 - 2 * x + 12 * x2 + 8 * x3),
-                ]
-            )
+        return self._evaluate_weight_polynomials(x)
 
-        x4 = x * x3
-        if self.interpolation_nodes == 5:
-            return torch.stack(
-                [
-                    1 / 24 * (2 * x - x2 - 2 * x3 + x4),
-                    1 / 24 * (-16 * x + 16 * x2 + 4 * x3 - 4 * x4),
-                    1 / 24 * (24 - 30 * x2 + 6 * x4),
-                    1 / 24 * (16 * x + 16 * x2 - 4 * x3 - 4 * x4),
-                    1 / 24 * (-2 * x - x2 + 2 * x3 + x4),
-                ]
-            )
+    def _evaluate_weight_polynomials(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Evaluate the polynomials of the 1D weights of all nodes at once, as the product
+        of the coefficient matrix with the powers of the relative positions. The
+        constant terms are added as the bias of the product, so that only the
+        non-trivial powers are allocated.
 
-        x5 = x * x4
-        if self.interpolation_nodes == 6:
-            return torch.stack(
-                [
-                    1 / 3840 * (45 - 18 * x - 200 * x2 + 80 * x3 + 80 * x4 - 32 * x5),
-                    1
-                    / 3840
-                    * (-375 + 250 * x + 1560 * x2 - 1040 * x3 - 240 * x4 + 160 * x5),
-                    1
-                    / 3840
-                    * (2250 - 4500 * x - 1360 * x2 + 2720 * x3 + 160 * x4 - 320 * x5),
-                    1
-                    / 3840
-                    * (2250 + 4500 * x - 1360 * x2 - 2720 * x3 + 160 * x4 + 320 * x5),
-                    1
-                    / 3840
-                    * (-375 - 250 * x + 1560 * x2 + 1040 * x3 - 240 * x4 - 160 * x5),
-                    1 / 3840 * (45 + 18 * x - 200 * x2 - 80 * x3 + 80 * x4 + 32 * x5),
-                ]
-            )
-        x6 = x * x5
-        if self.interpolation_nodes == 7:
-            return torch.stack(
-                [
-                    1 / 720 * (-12 * x + 4 * x2 + 15 * x3 - 5 * x4 - 3 * x5 + x6),
-                    1
-                    / 720
-                    * (108 * x - 54 * x2 - 120 * x3 + 60 * x4 + 12 * x5 - 6 * x6),
-                    1
-                    / 720
-                    * (-540 * x + 540 * x2 + 195 * x3 - 195 * x4 - 15 * x5 + 15 * x6),
-                    1 / 720 * (720 - 980 * x2 + 280 * x4 - 20 * x6),
-                    1
-                    / 720
-                    * (540 * x + 540 * x2 - 195 * x3 - 195 * x4 + 15 * x5 + 15 * x6),
-                    1
-                    / 720
-                    * (-108 * x - 54 * x2 + 120 * x3 + 60 * x4 - 12 * x5 - 6 * x6),
-                    1 / 720 * (12 * x + 4 * x2 - 15 * x3 - 5 * x4 + 3 * x5 + x6),
-                ]
-            )
-        raise ValueError("Only `interpolation_nodes` from 3 to 7 are allowed")
+        :param x: torch.tensor of shape ``(n, 3)``
+            Set of relative positions in the interval [-1/2, 1/2].
+
+        :return: torch.tensor of shape ``(interpolation_nodes, n, 3)``
+            Interpolation weights
+        """
+        shape = [self.interpolation_nodes] + list(x.shape)
+        if self.interpolation_nodes == 1:
+            return torch.ones(shape, dtype=x.dtype, device=x.device)
+
+        powers = [x]
+        for _ in range(2, self.interpolation_nodes):
+            powers.append(powers[-1] * x)
+
+        weights = torch.addmm(
+            self._weight_coefficients[:, :1],
+            self._weight_coefficients[:, 1:],
+            torch.stack(powers).reshape(self.interpolation_nodes - 1, -1),
+        )
+        return weights.reshape(shape)
 
     def compute_weights(self, positions: torch.Tensor):
         """
@@ -313,7 +411,7 @@ class MeshInterpolator(torch.nn.Module):
             )
 
         # Compute positions relative to the mesh basis vectors
-        positions_rel = self.ns_mesh * torch.matmul(positions, self.inverse_cell)
+        positions_rel = torch.matmul(positions, self._scaled_inverse_cell)
 
         # Calculate positions and distances based on interpolation nodes
         even = self.interpolation_nodes % 2 == 0
@@ -332,39 +430,47 @@ class MeshInterpolator(torch.nn.Module):
 
         # Compute weights based on distances and number of nodes
         self.interpolation_weights = self._compute_1d_weights(offsets)
+        if self._reduced_weights_precision:
+            self.interpolation_weights = self.interpolation_weights.to(
+                self._weights_dtype
+            )
 
         # Calculate indices of mesh points on which the particle weights are
         # interpolated. For each particle, its weight is "smeared" onto
-        # `interpolation_nodes**3` mesh points, which can be achived using meshgrid
-        # below.
-        indices_to_interpolate = torch.stack(
-            [
-                (positions_rel_idx + i) % self.ns_mesh
-                for i in range(
-                    1 - (self.interpolation_nodes + 1) // 2,
-                    1 + self.interpolation_nodes // 2,
-                )
-            ],
-            dim=0,
+        # `interpolation_nodes**3` mesh points, which are obtained by combining the
+        # `interpolation_nodes` indices along each axis.
+        center_offsets = self._center_offsets.view(-1, 1, 1)
+        indices_to_interpolate = positions_rel_idx.unsqueeze(0) + center_offsets
+        indices_to_interpolate.remainder_(self._ns_mesh_long)
+
+        # Generate a flattened representation of all the indices of the mesh points on
+        # which we wish to interpolate the density, as indices in the flattened mesh.
+        # The indices along the three axes are combined by broadcasting, with the nodes
+        # along z running fastest. They are shared by `points_to_mesh` and
+        # `mesh_to_points`.
+        n_nodes = self.interpolation_nodes
+        x_indices = indices_to_interpolate[:, :, 0] * self._ns_mesh_long[1]
+        y_indices = indices_to_interpolate[:, :, 1]
+        z_indices = indices_to_interpolate[:, :, 2]
+        xy_indices = x_indices.unsqueeze(1) + y_indices.unsqueeze(0)
+        xy_indices *= self._ns_mesh_long[2]
+        self.flat_indices = (xy_indices.unsqueeze(2) + z_indices).reshape(
+            n_nodes * n_nodes * n_nodes, n_positions
         )
 
-        # Generate shifts for x, y, z axes and flatten for indexing
-        x_shifts, y_shifts, z_shifts = torch.meshgrid(
-            torch.arange(self.interpolation_nodes, device=self._device),
-            torch.arange(self.interpolation_nodes, device=self._device),
-            torch.arange(self.interpolation_nodes, device=self._device),
-            indexing="ij",
+        # The contribution of each point to its `interpolation_nodes**3` mesh points is
+        # weighted by the outer product of the 1D weights along the three axes, ordered
+        # consistently with `flat_indices`. It is built once, by broadcasting, and
+        # shared by `points_to_mesh` and `mesh_to_points`.
+        wx = self.interpolation_weights[:, :, 0]
+        wy = self.interpolation_weights[:, :, 1]
+        wz = self.interpolation_weights[:, :, 2]
+        wyz = (wy.unsqueeze(1) * wz.unsqueeze(0)).reshape(
+            n_nodes * n_nodes, n_positions
+        )
+        self._weight_product = (wx.unsqueeze(1) * wyz.unsqueeze(0)).reshape(
+            n_nodes * n_nodes * n_nodes, n_positions
         )
-        self.x_shifts = x_shifts.flatten()
-        self.y_shifts = y_shifts.flatten()
-        self.z_shifts = z_shifts.flatten()
-
-        # Generate a flattened representation of all the indices
-        # of the mesh points on which we wish to interpolate the
-        # density.
-        self.x_indices = indices_to_interpolate[self.x_shifts, :, 0]
-        self.y_indices = indices_to_interpolate[self.y_shifts, :, 1]
-        self.z_indices = indices_to_interpolate[self.z_shifts, :, 2]
 
     def points_to_mesh(self, particle_weights: torch.Tensor) -> torch.Tensor:
         """
@@ -395,25 +501,20 @@ class MeshInterpolator(torch.nn.Module):
 
         # Update mesh values by combining particle weights and interpolation weights
         n_channels = particle_weights.shape[1]
-        nx = int(self.ns_mesh[0])
-        ny = int(self.ns_mesh[1])
-        nz = int(self.ns_mesh[2])
+        nx, ny, nz = self._get_mesh_shape()
         rho_mesh = torch.zeros(
-            (n_channels, nx, ny, nz), dtype=self._dtype, device=self._device
+            (n_channels, nx * ny * nz), dtype=self._dtype, device=self._device
         )
-        for a in range(n_channels):
-            rho_mesh[a].index_put_(
-                (self.x_indices, self.y_indices, self.z_indices),
-                (
-                    particle_weights[:, a]
-                    * self.interpolation_weights[self.x_shifts, :, 0]
-                    * self.interpolation_weights[self.y_shifts, :, 1]
-                    * self.interpolation_weights[self.z_shifts, :, 2]
-                ),
-                accumulate=True,
-            )
 
-        return rho_mesh
+        # The product of the 1D weights is shared by all channels, and is broadcasted
+        # against the particle weights of all channels, laid out as
+        # (n_channels, interpolation_nodes**3, n_points), which are then scattered onto
+        # the flattened mesh at once
+        values = particle_weights.T.contiguous().unsqueeze(1) * self._weight_product
+        flat_indices = self.flat_indices.reshape(1, -1).expand(n_channels, -1)
+        rho_mesh.scatter_add_(1, flat_indices, values.reshape(n_channels, -1))
+
+        return rho_mesh.reshape(n_channels, nx, ny, nz)
 
     def mesh_to_points(self, mesh_vals: torch.Tensor) -> torch.Tensor:
         """
@@ -436,13 +537,18 @@ class MeshInterpolator(torch.nn.Module):
                 "dimension 4"
             )
 
-        return (
-            (
-                mesh_vals[:, self.x_indices, self.y_indices, self.z_indices]
-                * self.interpolation_weights[self.x_shifts, :, 0]
-                * self.interpolation_weights[self.y_shifts, :, 1]
-                * self.interpolation_weights[self.z_shifts, :, 2]
-            )
-            .sum(dim=1)
-            .T
+        # Gather the values of all channels at the interpolation nodes from the
+        # flattened mesh, and contract them with the product of the 1D weights. The
+        # channels are kept as the last dimension of the flattened mesh, so that the
+        # reduction over the nodes directly gives a contiguous (n_points, n_channels)
+        # result.
+        n_channels = mesh_vals.shape[0]
+        weights = self._weight_product
+        mesh_vals_nodes = (
+            mesh_vals.reshape(n_channels, -1)
+            .T.contiguous()
+            .index_select(0, self.flat_indices.flatten())
+            .reshape(weights.shape[0], weights.shape[1], n_channels)
         )
+
+        return (mesh_vals_nodes * weights.unsqueeze(2)).sum(dim=0)
@@ -167,7 +167,8 @@ class Calculator(torch.nn.Module):
                 torch.int64, memory_format=torch.contiguous_format
             )
 
-        neighbor_distances = torch.linalg.norm(neighbors.values, dim=1).squeeze(1)
+        neighbor_distances = torch.sqrt(torch.sum(neighbors.values**2, dim=1))
+        neighbor_distances = neighbor_distances.squeeze(1)
 
         # `calculator._compute_single_system` is implemented only in child classes!
         potential = self._calculator.forward(
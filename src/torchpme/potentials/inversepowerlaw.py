@@ -64,6 +64,34 @@ class InversePowerLawPotential(Potential):
             "exponent", torch.tensor(exponent, dtype=dtype, device=device)
         )
 
+        # Gamma functions of the exponent used in the forward. They are cached as plain
+        # attributes rather than buffers, so that they are recomputed from `exponent`
+        # after it is moved to another dtype or device instead of being rounded, see
+        # `_get_gamma_constants`
+        self._gamma_constants = self._compute_gamma_constants()
+
+    def _compute_gamma_constants(self) -> torch.Tensor:
+        exponent = self.exponent
+        return gamma(torch.stack([exponent / 2, (3 - exponent) / 2, exponent / 2 + 1]))
+
+    def _get_gamma_constants(self) -> torch.Tensor:
+        r"""
+        :math:`\Gamma(p/2)`, :math:`\Gamma((3-p)/2)` and :math:`\Gamma(p/2+1)`, in the
+        dtype and on the device of the exponent :math:`p`.
+        """
+        gamma_constants = self._gamma_constants
+        if (
+            gamma_constants.dtype != self.exponent.dtype
+            or gamma_constants.device != self.exponent.device
+        ):
+            gamma_constants = self._compute_gamma_constants()
+            # Tensors created in inference mode can not be reused in a later
+            # calculation that requires gradients, so these are not cached
+            if not gamma_constants.is_inference():
+                self._gamma_constants = gamma_constants
+
+        return gamma_constants
+
     @torch.jit.export
     def from_dist(self, dist: torch.Tensor) -> torch.Tensor:
         """
@@ -121,8 +149,9 @@ class InversePowerLawPotential(Potential):
         exponent = self.exponent
         smearing = self.smearing
 
+        gamma_constants = self._get_gamma_constants()
         peff = (3 - exponent) / 2
-        prefac = torch.pi**1.5 / gamma(exponent / 2) * (2 * smearing**2) ** peff
+        prefac = torch.pi**1.5 / gamma_constants[0] * (2 * smearing**2) ** peff
         x = 0.5 * smearing**2 * k_sq
 
         # The k=0 term often needs to be set separately since for exponents p<=3
@@ -136,7 +165,7 @@ class InversePowerLawPotential(Potential):
         return torch.where(
             k_sq == 0,
             0.0,
-            prefac * gammaincc(peff, masked) / masked**peff * gamma(peff),
+            prefac * gammaincc(peff, masked) / masked**peff * gamma_constants[1],
         )
 
     def self_contribution(self) -> torch.Tensor:
@@ -146,7 +175,8 @@ class InversePowerLawPotential(Potential):
                 "Cannot compute self contribution without specifying `smearing`."
             )
         phalf = self.exponent / 2
-        return 1 / gamma(phalf + 1) / (2 * self.smearing**2) ** phalf
+        gamma_half_exponent_p1 = self._get_gamma_constants()[2]
+        return 1 / gamma_half_exponent_p1 / (2 * self.smearing**2) ** phalf
 
     def background_correction(self) -> torch.Tensor:
         # "charge neutrality" correction for 1/r^p potential
@@ -155,7 +185,7 @@ class InversePowerLawPotential(Potential):
                 "Cannot compute background correction without specifying `smearing`."
             )
         prefac = torch.pi**1.5 * (2 * self.smearing**2) ** ((3 - self.exponent) / 2)
-        prefac /= (3 - self.exponent) * gamma(self.exponent / 2)
+        prefac /= (3 - self.exponent) * self._get_gamma_constants()[0]
         return prefac
 
     self_contribution.__doc__ = Potential.self_contribution.__doc__
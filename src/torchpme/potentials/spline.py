@@ -117,6 +117,12 @@ class SplinePotential(Potential):
         else:
             self._yhat_at_zero = yhat_at_zero
 
+        # constant used in the forward, stored as a buffer to avoid creating a new
+        # tensor (on the wrong device) in every call
+        self.register_buffer(
+            "_background_correction", torch.zeros(1, dtype=dtype, device=device)
+        )
+
     def from_dist(self, dist: torch.Tensor) -> torch.Tensor:
         # if the full spline is not given, falls back on the lr part
         return self.lr_from_dist(dist) + self.sr_from_dist(dist)
@@ -140,7 +146,7 @@ class SplinePotential(Potential):
         return self._y_at_zero
 
     def background_correction(self) -> torch.Tensor:
-        return torch.tensor([0.0])
+        return self._background_correction
 
     from_dist.__doc__ = Potential.from_dist.__doc__
     lr_from_dist.__doc__ = Potential.lr_from_dist.__doc__
@@ -353,3 +353,244 @@ def test_random_structure(
     stress_target = torch.einsum("ab,aA,bB->AB", stress_target, ortho, ortho)
 
     torch.testing.assert_close(stress, stress_target, atol=0.0, rtol=5e-3)
+
+
+@pytest.mark.parametrize("kvectors_chunk_size", [1, 5, 100])
+def test_ewald_kvectors_chunk_size(kvectors_chunk_size):
+    """Accumulating the reciprocal space sum in chunks must not change the result."""
+    positions, charges, cell, _, _ = define_crystal("cu2o")
+    charges = charges.reshape((-1, 1))
+    neighbor_indices, neighbor_distances = neighbor_list(
+        positions=positions, periodic=True, box=cell
+    )
+
+    smearing = 0.2
+    potentials = []
+    for chunk_size in [4096, kvectors_chunk_size]:
+        calc = EwaldCalculator(
+            CoulombPotential(smearing=smearing),
+            lr_wavelength=smearing / 2,
+            kvectors_chunk_size=chunk_size,
+        )
+        calc.to(dtype=DTYPE)
+        potentials.append(
+            calc.forward(
+                positions=positions,
+                charges=charges,
+                cell=cell,
+                neighbor_indices=neighbor_indices,
+                neighbor_distances=neighbor_distances,
+            )
+        )
+
+    torch.testing.assert_close(potentials[0], potentials[1], atol=1e-12, rtol=1e-12)
+
+
+def test_ewald_kvectors_chunk_size_non_positive():
+    match = r"`kvectors_chunk_size` \(0\) has to be positive"
+    with pytest.raises(ValueError, match=match):
+        EwaldCalculator(
+            CoulombPotential(smearing=0.1), lr_wavelength=0.05, kvectors_chunk_size=0
+        )
+
+
+@pytest.mark.parametrize("crystal_name", ["CsCl", "cu2o", "wurtzite"])
+def test_ewald_mixed_precision(crystal_name):
+    """Single precision phase factors should only affect the result marginally."""
+    positions, charges, cell, _, _ = define_crystal(crystal_name)
+    charges = charges.reshape((-1, 1))
+    neighbor_indices, neighbor_distances = neighbor_list(
+        positions=positions, periodic=True, box=cell
+    )
+
+    smearing = 0.2
+    potentials = []
+    for mixed_precision in [False, True]:
+        calc = EwaldCalculator(
+            CoulombPotential(smearing=smearing),
+            lr_wavelength=smearing / 2,
+            mixed_precision=mixed_precision,
+        )
+        calc.to(dtype=DTYPE)
+        potentials.append(
+            calc.forward(
+                positions=positions,
+                charges=charges,
+                cell=cell,
+                neighbor_indices=neighbor_indices,
+                neighbor_distances=neighbor_distances,
+            )
+        )
+
+    assert potentials[1].dtype == DTYPE
+    torch.testing.assert_close(potentials[0], potentials[1], atol=0.0, rtol=1e-5)
+
+
+def test_ewald_kvectors_cache():
+    """The cached k-vectors must be reused for the same cell and updated otherwise."""
+    positions, charges, cell, _, _ = define_crystal("wurtzite")
+    charges = charges.reshape((-1, 1))
+
+    calc = EwaldCalculator(CoulombPotential(smearing=0.2), lr_wavelength=0.1)
+    calc.to(dtype=DTYPE)
+
+    potential = calc._compute_kspace(charges, cell, positions)
+    cached_kvectors = calc._cached_axis_kvectors
+    torch.testing.assert_close(calc._cached_cell, cell, atol=0.0, rtol=0.0)
+
+    # same cell: the k-vectors are taken from the cache
+    potential_cached = calc._compute_kspace(charges, cell.clone(), positions)
+    assert calc._cached_axis_kvectors is cached_kvectors
+    torch.testing.assert_close(potential, potential_cached, atol=0.0, rtol=0.0)
+
+    # different cell: the cache is updated
+    cell_scaled = 1.1 * cell
+    positions_scaled = 1.1 * positions
+    potential_scaled = calc._compute_kspace(charges, cell_scaled, positions_scaled)
+    assert calc._cached_axis_kvectors is not cached_kvectors
+
+    calc_ref = EwaldCalculator(CoulombPotential(smearing=0.2), lr_wavelength=0.1)
+    calc_ref.to(dtype=DTYPE)
+    potential_ref = calc_ref._compute_kspace(charges, cell_scaled, positions_scaled)
+    torch.testing.assert_close(potential_scaled, potential_ref, atol=0.0, rtol=0.0)
+
+    # cells that require gradients are never cached
+    cell_grad = cell.clone().requires_grad_(True)
+    calc._compute_kspace(charges, cell_grad, positions).sum().backward()
+    assert cell_grad.grad is not None
+    torch.testing.assert_close(calc._cached_cell, cell_scaled, atol=0.0, rtol=0.0)
+
+
+@pytest.mark.parametrize("n_channels", [1, 3])
+@pytest.mark.parametrize("mixed_precision", [False, True])
+def test_ewald_forward_batch(n_channels, mixed_precision):
+    """Batched calculations must match separate calculations for each structure."""
+    calc = EwaldCalculator(
+        CoulombPotential(smearing=0.2),
+        lr_wavelength=0.1,
+        mixed_precision=mixed_precision,
+    )
+    calc.to(dtype=DTYPE)
+
+    torch.manual_seed(12345)
+
+    positions_all = []
+    charges_all = []
+    cells = []
+    neighbor_indices_all = []
+    neighbor_distances_all = []
+    batch = []
+    potentials_ref = []
+    n_atoms = 0
+    for i_structure, crystal_name in enumerate(["CsCl", "cu2o", "wurtzite"]):
+        positions, charges, cell, _, _ = define_crystal(crystal_name)
+        # the additional channels contain random charges
+        random_charges = torch.randn((len(positions), n_channels - 1), dtype=DTYPE)
+        charges = torch.cat([charges.reshape((-1, 1)), random_charges], dim=1)
+        neighbor_indices, neighbor_distances = neighbor_list(
+            positions=positions, periodic=True, box=cell
+        )
+
+        potentials_ref.append(
+            calc.forward(
+                positions=positions,
+                charges=charges,
+                cell=cell,
+                neighbor_indices=neighbor_indices,
+                neighbor_distances=neighbor_distances,
+            )
+        )
+
+        positions_all.append(positions)
+        charges_all.append(charges)
+        cells.append(cell)
+        neighbor_indices_all.append(neighbor_indices + n_atoms)
+        neighbor_distances_all.append(neighbor_distances)
+        batch.append(torch.full((len(positions),), i_structure))
+        n_atoms += len(positions)
+
+    potential = calc.forward_batch(
+        positions=torch.cat(positions_all),
+        charges=torch.cat(charges_all),
+        cell=torch.stack(cells),
+        neighbor_indices=torch.cat(neighbor_indices_all),
+        neighbor_distances=torch.cat(neighbor_distances_all),
+        batch=torch.cat(batch),
+    )
+
+    assert potential.shape == (n_atoms, n_channels)
+    assert potential.dtype == DTYPE
+    if mixed_precision:
+        # both calculations use single precision phase factors, with a different
+        # ordering of the k-vectors
+        torch.testing.assert_close(
+            potential, torch.cat(potentials_ref), atol=0.0, rtol=1e-5
+        )
+    else:
+        torch.testing.assert_close(potential, torch.cat(potentials_ref))
+
+
+def test_ewald_forward_batch_wrong_cell():
+    positions, charges, cell, _, _ = define_crystal("CsCl")
+    calc = EwaldCalculator(CoulombPotential(smearing=0.2), lr_wavelength=0.1)
+    calc.to(dtype=DTYPE)
+
+    match = r"`cell` must be a tensor with shape \[n_structures, 3, 3\]"
+    with pytest.raises(ValueError, match=match):
+        calc.forward_batch(
+            positions=positions,
+            charges=charges.reshape((-1, 1)),
+            cell=cell,
+            neighbor_indices=torch.zeros((0, 2), dtype=torch.long),
+            neighbor_distances=torch.zeros(0, dtype=DTYPE),
+            batch=torch.zeros(len(positions), dtype=torch.long),
+        )
+
+
+@pytest.mark.parametrize(
+    ("cell", "batch", "match"),
+    [
+        (
+            torch.zeros((0, 3, 3), dtype=DTYPE),
+            torch.zeros(2, dtype=torch.long),
+            (
+                r"`cell` must contain at least one structure, got tensor with shape "
+                r"\[0, 3, 3\]"
+            ),
+        ),
+        (
+            torch.eye(3, dtype=DTYPE).expand(2, 3, 3),
+            torch.zeros(2, dtype=DTYPE),
+            r"type of `batch` \(torch.float64\) must be torch.int32 or torch.int64",
+        ),
+        (
+            torch.eye(3, dtype=DTYPE).expand(2, 3, 3),
+            torch.tensor([0, 2]),
+            (
+                r"`batch` must contain indices between 0 and 1 for 2 structure\(s\), got "
+                r"values between 0 and 2"
+            ),
+        ),
+        (
+            torch.eye(3, dtype=DTYPE).expand(2, 3, 3),
+            torch.tensor([-1, 1]),
+            (
+                r"`batch` must contain indices between 0 and 1 for 2 structure\(s\), got "
+                r"values between -1 and 1"
+            ),
+        ),
+    ],
+)
+def test_ewald_forward_batch_wrong_batch(cell, batch, match):
+    calc = EwaldCalculator(CoulombPotential(smearing=0.2), lr_wavelength=0.1)
+    calc.to(dtype=DTYPE)
+
+    with pytest.raises(ValueError, match=match):
+        calc.forward_batch(
+            positions=torch.zeros((2, 3), dtype=DTYPE),
+            charges=torch.ones((2, 1), dtype=DTYPE),
+            cell=cell,
+            neighbor_indices=torch.zeros((0, 2), dtype=torch.long),
+            neighbor_distances=torch.zeros(0, dtype=DTYPE),
+            batch=batch,
+        )
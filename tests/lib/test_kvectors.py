@@ -6,6 +6,12 @@ from torchpme.lib import (
     generate_kvectors_for_ewald,
     generate_kvectors_for_mesh,
 )
+from torchpme.lib.kvectors import (
+    _generate_kvector_axes,
+    _kvectors_norm_sq,
+    _reciprocal_cell,
+    _signed_indices,
+)
 
 # Generate random cells and mesh parameters
 cells = []
@@ -34,14 +40,15 @@ def test_duality_of_kvectors_mesh(cell, ns):
     ix_refs[ix_refs >= (nx + 1) // 2] -= nx
     iy_refs = torch.arange(ny)
     iy_refs[iy_refs >= (ny + 1) // 2] -= ny
+    iz_refs = torch.arange((nz + 1) // 2)
 
-    for ix in range(nx):
-        for iy in range(ny):
-            for iz in range((nz + 1) // 2):
-                inner_prods = torch.matmul(cell, kvectors[ix, iy, iz]) / 2 / torch.pi
-                inner_prods = torch.round(inner_prods)
-                inner_prods_ref = torch.tensor([ix_refs[ix], iy_refs[iy], iz]) * 1.0
-                assert_close(inner_prods, inner_prods_ref, atol=1e-15, rtol=0.0)
+    # Inner products of all kvectors with the three basis vectors of the cell at once
+    inner_prods = kvectors[:, :, : (nz + 1) // 2] @ cell.T / 2 / torch.pi
+    inner_prods = torch.round(inner_prods)
+    inner_prods_ref = torch.stack(
+        torch.meshgrid(ix_refs, iy_refs, iz_refs, indexing="ij"), dim=-1
+    ).to(inner_prods.dtype)
+    assert_close(inner_prods, inner_prods_ref, atol=1e-15, rtol=0.0)
 
 
 @pytest.mark.parametrize("ns", ns_list)
@@ -64,17 +71,16 @@ def test_duality_of_kvectors_squeezed(cell, ns):
     iz_refs = torch.arange(nz)
     iz_refs[iz_refs >= (nz + 1) // 2] -= nz
 
-    i_tot = 0
-    for ix in range(nx):
-        for iy in range(ny):
-            for iz in range(nz):
-                inner_prods = torch.matmul(cell, kvectors[i_tot]) / 2 / torch.pi
-                inner_prods = torch.round(inner_prods)
-                inner_prods_ref = (
-                    torch.tensor([ix_refs[ix], iy_refs[iy], iz_refs[iz]]) * 1.0
-                )
-                assert_close(inner_prods, inner_prods_ref, atol=1e-15, rtol=0.0)
-                i_tot += 1
+    # Inner products of all kvectors with the three basis vectors of the cell at once.
+    # The kvectors are flattened with the z index running fastest.
+    inner_prods = kvectors @ cell.T / 2 / torch.pi
+    inner_prods = torch.round(inner_prods)
+    inner_prods_ref = torch.stack(
+        torch.meshgrid(ix_refs, iy_refs, iz_refs, indexing="ij"), dim=-1
+    ).reshape(-1, 3)
+    assert_close(
+        inner_prods, inner_prods_ref.to(inner_prods.dtype), atol=1e-15, rtol=0.0
+    )
 
 
 @pytest.mark.parametrize("ns", ns_list)
@@ -102,6 +108,40 @@ def test_lenghts_of_kvectors(cell, ns, kvec_type):
     assert torch.all(norms_all < norm_bound)
 
 
+@pytest.mark.parametrize("cell", cells)
+def test_reciprocal_cell(cell):
+    cell = cell.to(torch.float64)
+    reciprocal_cell, volume = _reciprocal_cell(cell)
+
+    assert_close(reciprocal_cell, 2 * torch.pi * torch.linalg.inv(cell).T)
+    assert_close(volume, torch.linalg.det(cell))
+
+    # a batch of cells gives the same result as the individual cells
+    reciprocal_cells, volumes = _reciprocal_cell(torch.stack([cell, 2 * cell]))
+    assert_close(reciprocal_cells[0], reciprocal_cell)
+    assert_close(volumes[1], 8 * volume)
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 8])
+def test_signed_indices(n):
+    indices = _signed_indices(n, device=torch.device("cpu"), dtype=torch.float64)
+    assert_close(indices, n * torch.fft.fftfreq(n, dtype=torch.float64))
+
+
+@pytest.mark.parametrize("for_ewald", [True, False])
+@pytest.mark.parametrize("ns", ns_list)
+@pytest.mark.parametrize("cell", cells)
+def test_kvectors_norm_sq(cell, ns, for_ewald):
+    cell = cell.to(torch.float64)
+    reciprocal_cell, _ = _reciprocal_cell(cell)
+    kxs, kys, kzs = _generate_kvector_axes(
+        reciprocal_cell=reciprocal_cell, ns=ns, for_ewald=for_ewald
+    )
+    kvectors = kxs[:, None, None] + kys[None, :, None] + kzs[None, None, :]
+
+    assert_close(_kvectors_norm_sq(kxs, kys, kzs), torch.sum(kvectors**2, dim=-1))
+
+
 # Tests that errors are raised when the inputs are of the wrong shape or have
 # inconsistent devices
 @pytest.mark.parametrize("generate_kvectors", kvec_generators)
@@ -146,6 +146,35 @@ class TestMeshInterpolatorForward:
         # this should not be an issue.
         assert_close(particle_weights, recovered_weights, rtol=4e-5, atol=1e-6)
 
+    @pytest.mark.parametrize("method", ["P3M", "Lagrange"])
+    def test_channels_independent(self, method):
+        """
+        Test that interpolating several channels at once gives the same result as
+        interpolating each channel separately.
+        """
+        torch.random.manual_seed(8794329)
+        n_particles = 20
+        n_channels = 4
+
+        cell = torch.randn((3, 3), dtype=torch.float64) + 3 * torch.eye(3)
+        positions = torch.randn((n_particles, 3), dtype=torch.float64)
+        particle_weights = torch.randn((n_particles, n_channels), dtype=torch.float64)
+        ns_mesh = torch.tensor([5, 6, 7])
+
+        interpolator = MeshInterpolator(
+            cell=cell, ns_mesh=ns_mesh, interpolation_nodes=4, method=method
+        )
+        interpolator.compute_weights(positions)
+        mesh_values = interpolator.points_to_mesh(particle_weights)
+        interpolated_values = interpolator.mesh_to_points(mesh_values)
+
+        for a in range(n_channels):
+            mesh_values_a = interpolator.points_to_mesh(particle_weights[:, a : a + 1])
+            assert_close(mesh_values[a : a + 1], mesh_values_a)
+
+            interpolated_values_a = interpolator.mesh_to_points(mesh_values_a)
+            assert_close(interpolated_values[:, a : a + 1], interpolated_values_a)
+
 
 class TestMeshInterpolatorBackward:
     """Tests for the "mesh_to_points" function of the MeshInterpolator class"""
@@ -365,6 +394,31 @@ def test_update_devive():
     assert mesh_interpolator._device == cell_update.device
 
 
+@pytest.mark.parametrize("method", ["P3M", "Lagrange"])
+def test_update_dtype(method):
+    torch.random.manual_seed(3482389)
+    cell = 3 * torch.eye(3, dtype=torch.float64)
+    ns_mesh = torch.tensor([6, 7, 8])
+    positions = 3 * torch.rand((20, 3), dtype=torch.float64)
+
+    # built with a single precision cell, as done by the calculators
+    mesh_interpolator = MeshInterpolator(
+        cell.to(torch.float32), ns_mesh, 5, method=method
+    )
+    mesh_interpolator.update(cell=cell)
+    mesh_interpolator.compute_weights(positions)
+
+    reference = MeshInterpolator(cell, ns_mesh, 5, method=method)
+    reference.compute_weights(positions)
+
+    torch.testing.assert_close(
+        mesh_interpolator.interpolation_weights,
+        reference.interpolation_weights,
+        rtol=0,
+        atol=0,
+    )
+
+
 def test_update_cell_wrong_shape():
     mesh_interpolator = MeshInterpolator(
         cell=torch.eye(3),
@@ -484,6 +538,32 @@ def test_mexh_xyz_shape(mesh_interpolator, request):
     assert xyz.shape == (2, 2, 2, 3)
 
 
+def test_mexh_xyz_cached():
+    cell = torch.eye(3)
+    mesh_interpolator = MeshInterpolator(cell, torch.tensor([2, 3, 4]), 3, method="P3M")
+    xyz = mesh_interpolator.get_mesh_xyz()
+    assert mesh_interpolator.get_mesh_xyz() is xyz
+
+    # updating the cell or the mesh invalidates the cached positions
+    mesh_interpolator.update(cell=2 * cell)
+    torch.testing.assert_close(mesh_interpolator.get_mesh_xyz(), 2 * xyz)
+
+    mesh_interpolator.update(ns_mesh=torch.tensor([4, 4, 4]))
+    assert mesh_interpolator.get_mesh_xyz().shape == (4, 4, 4, 3)
+
+
+def test_mesh_xyz_inference_mode():
+    cell = torch.eye(3)
+    mesh_interpolator = MeshInterpolator(cell, torch.tensor([2, 3, 4]), 3, method="P3M")
+    with torch.inference_mode():
+        mesh_interpolator.get_mesh_xyz()
+
+    # positions computed in inference mode are not reused outside of it
+    prefactor = torch.tensor(2.0, requires_grad=True)
+    (mesh_interpolator.get_mesh_xyz() * prefactor).sum().backward()
+    assert prefactor.grad is not None
+
+
 @pytest.mark.parametrize(
     "mesh_interpolator", ["P3M_mesh_interpolator", "Lagrange_mesh_interpolator"]
 )
@@ -496,6 +576,21 @@ def test_positions_wrong_device(mesh_interpolator, request):
         mesh_interpolator.compute_weights(positions)
 
 
+@pytest.mark.parametrize(
+    "mesh_interpolator", ["P3M_mesh_interpolator", "Lagrange_mesh_interpolator"]
+)
+def test_no_positions(mesh_interpolator, request):
+    mesh_interpolator = request.getfixturevalue(mesh_interpolator)
+    mesh_interpolator.compute_weights(torch.zeros((0, 3)))
+
+    rho_mesh = mesh_interpolator.points_to_mesh(torch.zeros((0, 2)))
+    assert rho_mesh.shape == (2, 2, 2, 2)
+    assert torch.all(rho_mesh == 0)
+
+    interpolated = mesh_interpolator.mesh_to_points(torch.randn((2, 2, 2, 2)))
+    assert interpolated.shape == (0, 2)
+
+
 @pytest.mark.parametrize(
     "mesh_interpolator", ["P3M_mesh_interpolator", "Lagrange_mesh_interpolator"]
 )
@@ -548,3 +643,73 @@ def test_wrong_method():
     match = "method 'foo' is not supported. Choose from 'Lagrange' or 'P3M'"
     with pytest.raises(ValueError, match=match):
         MeshInterpolator(torch.eye(3), torch.ones(3), 2, method="foo")
+
+
+def test_wrong_weights_dtype():
+    match = "`weights_dtype` torch.int32 has to be a floating point dtype"
+    with pytest.raises(ValueError, match=match):
+        MeshInterpolator(
+            torch.eye(3), torch.ones(3), 2, method="P3M", weights_dtype=torch.int32
+        )
+
+
+def test_weights_dtype_wider_than_cell():
+    match = (
+        "`weights_dtype` torch.float64 can not be wider than the dtype torch.float32 "
+        "of `cell`"
+    )
+    with pytest.raises(ValueError, match=match):
+        MeshInterpolator(
+            torch.eye(3), torch.ones(3), 2, method="P3M", weights_dtype=torch.float64
+        )
+
+    # the dtype is checked again when the cell changes
+    mesh_interpolator = MeshInterpolator(
+        torch.eye(3, dtype=torch.float64),
+        torch.ones(3),
+        2,
+        method="P3M",
+        weights_dtype=torch.float32,
+    )
+    mesh_interpolator.update(cell=torch.eye(3, dtype=torch.float32))
+    with pytest.raises(ValueError, match="can not be wider than the dtype"):
+        mesh_interpolator.update(cell=torch.eye(3, dtype=torch.float16))
+
+
+@pytest.mark.parametrize("method", ["P3M", "Lagrange"])
+@pytest.mark.parametrize("weights_dtype", [torch.float32, torch.bfloat16])
+def test_weights_dtype(method, weights_dtype):
+    torch.random.manual_seed(3482389)
+    cell = 3 * torch.eye(3, dtype=torch.float64)
+    ns_mesh = torch.tensor([6, 7, 8])
+    positions = 3 * torch.rand((20, 3), dtype=torch.float64)
+    particle_weights = torch.randn((20, 2), dtype=torch.float64)
+
+    reference = MeshInterpolator(cell, ns_mesh, 4, method=method)
+    interpolator = MeshInterpolator(
+        cell, ns_mesh, 4, method=method, weights_dtype=weights_dtype
+    )
+
+    reference.compute_weights(positions)
+    interpolator.compute_weights(positions)
+    assert interpolator.interpolation_weights.dtype == weights_dtype
+
+    # the stored weights take less memory than in the precision of the cell
+    weight_product = interpolator._weight_product
+    ref_weight_product = reference._weight_product
+    assert weight_product.dtype == weights_dtype
+    assert weight_product.shape == ref_weight_product.shape
+    assert weight_product.element_size() < ref_weight_product.element_size()
+
+    # the mesh values keep the precision of the cell
+    ref_mesh = reference.points_to_mesh(particle_weights)
+    mesh = interpolator.points_to_mesh(particle_weights)
+    assert mesh.dtype == torch.float64
+
+    ref_points = reference.mesh_to_points(ref_mesh)
+    points = interpolator.mesh_to_points(ref_mesh)
+    assert points.dtype == torch.float64
+
+    eps = torch.finfo(weights_dtype).eps
+    torch.testing.assert_close(mesh, ref_mesh, rtol=0, atol=10 * eps)
+    torch.testing.assert_close(points, ref_points, rtol=0, atol=10 * eps)
@@ -221,6 +221,25 @@ def test_exponent_out_of_range():
         InversePowerLawPotential(exponent=4, smearing=0.0)
 
 
+def test_inverse_power_law_to_dtype():
+    # the constants depending on the exponent are recomputed in the new dtype
+    potential = InversePowerLawPotential(exponent=1.3, smearing=0.7)
+    assert list(potential.state_dict()) == ["smearing", "exponent"]
+
+    potential.to(dtype=torch.float64)
+    exponent = potential.exponent.item()
+    smearing = potential.smearing.item()
+
+    self_contribution = potential.self_contribution()
+    assert self_contribution.dtype == torch.float64
+    assert_close(
+        self_contribution,
+        1 / gamma(exponent / 2 + 1) / (2 * smearing**2) ** (exponent / 2),
+        rtol=1e-14,
+        atol=0.0,
+    )
+
+
 @pytest.mark.parametrize("potential", [CoulombPotential, InversePowerLawPotential])
 def test_range_none(potential):
     if potential is InversePowerLawPotential: